@@ -0,0 +1,69 @@
+
+import math
+from hashlib import blake2b
+
+class BloomFilter:
+    """Fixed-size Bloom filter backed by a bytearray"""
+
+    def __init__(self, capacity=100_000, error_rate=1e-6):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Standard sizing: m = -n*ln(p)/ln(2)^2 bits, k = (m/n)*ln(2) hashes
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key):
+        """Yield the bit positions for a key (double hashing on blake2b)"""
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key):
+        """Add a key to the filter"""
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def tofile(self, f):
+        """Write the bit array to an open binary file"""
+        f.write(bytes(self.bits))
+
+    @classmethod
+    def fromfile(cls, f, capacity=100_000, error_rate=1e-6):
+        """Load a filter saved with tofile() (same capacity/error_rate required)"""
+        bloom = cls(capacity, error_rate)
+        data = f.read(len(bloom.bits))
+        if len(data) != len(bloom.bits):
+            raise ValueError("Bloom filter file has wrong size")
+        bloom.bits = bytearray(data)
+        return bloom
+
+class Bitset:
+    """Growable exact bit set for message numbers (1 bit per number),
+    with a plain set fallback for values outside the dense range"""
+
+    def __init__(self, max_dense=1 << 24):
+        self.max_dense = max_dense
+        self.bits = bytearray()
+        self.sparse = set()
+
+    def add(self, n):
+        """Add a number to the set"""
+        if 0 <= n < self.max_dense:
+            byte = n >> 3
+            if byte >= len(self.bits):
+                self.bits.extend(b"\x00" * (byte + 1 - len(self.bits)))
+            self.bits[byte] |= 1 << (n & 7)
+        else:
+            self.sparse.add(n)
+
+    def __contains__(self, n):
+        if 0 <= n < self.max_dense:
+            byte = n >> 3
+            return byte < len(self.bits) and bool(self.bits[byte] & (1 << (n & 7)))
+        return n in self.sparse
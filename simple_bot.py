@@ -11,21 +11,33 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from compteur import get_compteurs, update_compteurs, reset_compteurs_canal
 from style import afficher_compteurs_canal
+from bloom import BloomFilter, Bitset
 import re
 import json
 import asyncio
+from collections import Counter, namedtuple
 from datetime import datetime, timezone, timedelta
 
-# Track processed messages per channel
-processed_messages = set()
+# Track processed messages per channel (one bounded Bloom filter per channel,
+# so a reset can drop a single channel's history)
+BLOOM_CAPACITY = 100_000
+BLOOM_ERROR_RATE = 1e-6
+processed_blooms = {}  # {chat_id: BloomFilter}
+# Exact per-channel index of numeros seen this run (and replayed from the
+# log), built at write time so lookups never hit a Bloom false positive
+# for messages we actually saw (1 bit per numero instead of a boxed int)
+processed_numeros = {}  # {chat_id: Bitset}
 
 # Auto report settings per channel
-auto_report_settings = {}  # {chat_id: {"interval": minutes, "task": task_object}}
+AutoReport = namedtuple("AutoReport", "interval task")
+auto_report_settings = {}  # {chat_id: AutoReport}
+
+# Benin timezone (UTC+1), built once instead of per call
+_BENIN_TZ = timezone(timedelta(hours=1))
 
 def get_benin_time():
     """Get current time in Benin timezone (UTC+1)"""
-    benin_tz = timezone(timedelta(hours=1))
-    return datetime.now(benin_tz)
+    return datetime.now(_BENIN_TZ)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,46 +46,333 @@ logger = logging.getLogger(__name__)
 # Global variables
 style_affichage = 1
 
+# Precompiled patterns and constant symbols for the message hot path
+_NUM_RE = re.compile(r"#n(\d+)")
+_PAREN_RE = re.compile(r"\(([^()]*)\)")
+_SUITS = ("♦️", "♣️", "♠️")
+# Matches any suit symbol (both heart variants) for single-pass counting
+_ALL_SUITS_RE = re.compile("|".join(map(re.escape, ("❤️", "♥️") + _SUITS)))
+
+# Prebuilt message texts: static parts assembled once at import time,
+# only the dynamic fields are filled in per call
+_RESET_MSG = (
+    "✅ **Reset effectué pour ce canal**\n\n"
+    "📊 Compteurs remis à zéro\n"
+    "⏰ Bilans automatiques arrêtés\n"
+    "🔄 Historique des messages effacé\n"
+    "⏳ Éditions en attente annulées"
+)
+
+_AUTO_REPORT_TMPL = (
+    "📊 **Bilan automatique du compteur**\n\n"
+    "🕐 **Heure :** {heure} (heure du Bénin)\n\n"
+    "♣️ **Trèfle :** {trefle} ✅\n"
+    "♦️ **Carreau :** {carreau} ✅\n"
+    "♠️ **Pique :** {pique} ✅\n"
+    "❤️ **Coeur :** {coeur} ✅\n\n"
+    "🔄 **Compteurs remis à zéro pour le prochain cycle**"
+)
+
+_TIME_SET_TMPL = (
+    "✅ **Bilan automatique configuré**\n\n"
+    "⏰ **Intervalle :** {interval} minutes\n"
+    "🕐 **Prochaine execution :** dans {interval} minutes\n\n"
+    "📊 Le bilan sera envoyé automatiquement avec l'heure du Bénin,\n"
+    "puis les compteurs seront remis à zéro."
+)
+
+_TIME_USAGE_MSG = (
+    "⏰ **Commande /time**\n\n"
+    "Définit l'intervalle pour les bilans automatiques.\n\n"
+    "📝 **Usage :** /time [minutes]\n"
+    "📊 **Exemple :** /time 15\n\n"
+    "⏱️ **Intervalle autorisé :** 5 à 32 minutes\n\n"
+    "💡 **Note :** Le bilan sera envoyé automatiquement "
+    "et les compteurs seront remis à zéro après chaque bilan."
+)
+
+_INTERVAL_ERR_TMPL = (
+    "❌ **Erreur d'intervalle**\n\n"
+    "L'intervalle doit être entre 5 et 32 minutes.\n"
+    "Vous avez saisi : {interval} minutes"
+)
+
+_WELCOME_MSG = (
+    "🤖 **Bot de Comptage de Cartes** 🃏\n\n"
+    "Bonjour ! Je compte les cartes séparément pour chaque canal.\n\n"
+    "📝 **Comment ça marche :**\n"
+    "• Envoyez un message avec des cartes entre parenthèses\n"
+    "• Exemple : Résultat du tirage (❤️♦️♣️♠️)\n"
+    "• Je compterai automatiquement chaque symbole\n\n"
+    "🎯 **Symboles reconnus :**\n"
+    "❤️ Cœurs • ♦️ Carreaux • ♣️ Trèfles • ♠️ Piques\n\n"
+    "💡 **Commandes disponibles :**\n"
+    "• /reset - Réinitialiser les compteurs\n"
+    "• /time [minutes] - Configurer bilans automatiques (5-32min)\n"
+    "• /deposer - Créer package de déploiement\n\n"
+    "⚡ Je suis maintenant actif et prêt à compter !"
+)
+
+_GROUP_WELCOME_MSG = (
+    "👋 **Salut tout le monde !** 🃏\n\n"
+    "Je suis le **Bot de Comptage de Cartes** !\n\n"
+    "🎯 **Ma mission :**\n"
+    "Je vais compter automatiquement tous les symboles de cartes "
+    "que vous mettez entre parenthèses dans vos messages.\n\n"
+    "📋 **Les compteurs sont séparés par canal !**\n"
+    "Chaque canal aura ses propres totaux.\n\n"
+    "🃏 **Cartes reconnues :**\n"
+    "❤️ Cœurs • ♦️ Carreaux • ♣️ Trèfles • ♠️ Piques\n\n"
+    "⚡ **Je suis maintenant actif !**\n\n"
+    "💡 **Commandes utiles :**\n"
+    "• /reset - Réinitialiser les compteurs de ce canal\n"
+    "• /time [minutes] - Bilans automatiques (5-32min)\n"
+    "• /start - Revoir ce message d'aide"
+)
+
+# Debounced persistence: callers just flag state dirty, a background
+# coroutine flushes to disk at most once per interval off the event loop
+FLUSH_INTERVAL = 1.0
+_persist_event = asyncio.Event()
+_status_payload = {"running": False, "last_message": None, "error": None}
+_status_dirty = False
+_processed_dirty = False
+
+def _write_status(status):
+    """Write status to file (blocking, runs in executor or at shutdown)"""
+    try:
+        with open("bot_status.json", "w") as f:
+            json.dump(status, f)
+    except (OSError, TypeError) as e:
+        logger.warning(f"Status write failed: {e}")
+
 def save_bot_status(running, message=None, error=None):
-    """Save status to file"""
-    status = {
+    """Queue status for the debounced flusher (direct write if no loop runs)"""
+    global _status_payload, _status_dirty
+    _status_payload = {
         "running": running,
         "last_message": message,
         "error": error
     }
     try:
-        with open("bot_status.json", "w") as f:
-            json.dump(status, f)
-    except:
-        pass
+        asyncio.get_running_loop()
+    except RuntimeError:
+        _write_status(_status_payload)
+    else:
+        _status_dirty = True
+        _persist_event.set()
+
+def get_processed_fichier(chat_id):
+    """Get filename for specific channel processed-messages filter"""
+    # Keep the sign: private chats have positive ids, channels negative ones
+    return f"processed_{chat_id}.bf"
+
+def get_processed_bloom(chat_id):
+    """Get (or create) the Bloom filter for a channel"""
+    if chat_id not in processed_blooms:
+        processed_blooms[chat_id] = BloomFilter(BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+    return processed_blooms[chat_id]
+
+# Append-only log of marks since the last filter snapshot, so per-message
+# persistence costs one line instead of a full rewrite. Before a snapshot
+# the log is rotated to PROCESSED_LOG_OLD, which is only deleted once the
+# snapshot is safely on disk
+PROCESSED_LOG = "processed.log"
+PROCESSED_LOG_OLD = PROCESSED_LOG + ".1"
+_processed_log_fh = None
 
-def is_message_processed(message_key):
+def _log_processed(line):
+    """Append one line to the processed-messages log"""
+    global _processed_log_fh
+    try:
+        if _processed_log_fh is None:
+            _processed_log_fh = open(PROCESSED_LOG, "a", buffering=1)
+        _processed_log_fh.write(line)
+    except OSError as e:
+        logger.warning(f"Processed log append failed: {e}")
+
+def _remember_numero(chat_id, numero):
+    """Record a numero in both the Bloom filter and the exact index"""
+    get_processed_bloom(chat_id).add(str(numero))
+    processed_numeros.setdefault(chat_id, Bitset()).add(numero)
+
+def is_message_processed(chat_id, numero):
     """Check if message was already processed"""
-    return message_key in processed_messages
+    numeros = processed_numeros.get(chat_id)
+    if numeros is not None and numero in numeros:
+        return True
+    # Fall back to the filter for history loaded from snapshots
+    bloom = processed_blooms.get(chat_id)
+    return bloom is not None and str(numero) in bloom
 
-def mark_message_processed(message_key):
+def mark_message_processed(chat_id, numero):
     """Mark message as processed"""
-    processed_messages.add(message_key)
-    
+    _remember_numero(chat_id, numero)
+    _log_processed(f"{chat_id} {numero}\n")
+
+def clear_processed_messages(chat_id):
+    """Drop the processed-messages filter for a single channel"""
+    processed_blooms.pop(chat_id, None)
+    processed_numeros.pop(chat_id, None)
+    _log_processed(f"reset {chat_id}\n")
+    fichier = get_processed_fichier(chat_id)
+    if os.path.exists(fichier):
+        try:
+            os.remove(fichier)
+        except OSError as e:
+            logger.warning(f"Could not remove {fichier}: {e}")
+
 def load_processed_messages():
-    """Load processed messages from file"""
-    global processed_messages
-    try:
-        with open("processed_messages.json", "r") as f:
-            processed_messages = set(json.load(f))
-    except:
-        processed_messages = set()
+    """Load processed messages filters from files and replay the log"""
+    for fichier in os.listdir("."):
+        if fichier.startswith("processed_") and fichier.endswith(".bf"):
+            try:
+                chat_id = int(fichier.replace("processed_", "").replace(".bf", ""))
+                with open(fichier, "rb") as f:
+                    processed_blooms[chat_id] = BloomFilter.fromfile(
+                        f, BLOOM_CAPACITY, BLOOM_ERROR_RATE
+                    )
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping filter file {fichier}: {e}")
+                continue
+
+    # Replay marks and resets recorded since the last snapshot: first a
+    # rotated log left over by an interrupted compaction, then the current one
+    for log_file in (PROCESSED_LOG_OLD, PROCESSED_LOG):
+        if not os.path.exists(log_file):
+            continue
+        try:
+            with open(log_file, "r") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) != 2:
+                        continue
+                    if parts[0] == "reset":
+                        processed_blooms.pop(int(parts[1]), None)
+                        processed_numeros.pop(int(parts[1]), None)
+                    else:
+                        _remember_numero(int(parts[0]), int(parts[1]))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Processed log replay failed for {log_file}: {e}")
+
+def _rotate_processed_log():
+    """Move the current log aside before a snapshot. Runs on the event loop
+    thread, so no mark can interleave with the swap; marks made during the
+    snapshot go to a fresh log and are replayed on top at startup"""
+    global _processed_log_fh
+    if _processed_log_fh is not None:
+        try:
+            _processed_log_fh.close()
+        except OSError:
+            pass
+        _processed_log_fh = None
+    if os.path.exists(PROCESSED_LOG):
+        try:
+            if os.path.exists(PROCESSED_LOG_OLD):
+                # A previous snapshot failed, so the rotated log is still
+                # the only durable copy of its marks; append the current
+                # log to it instead of clobbering it
+                with open(PROCESSED_LOG, "r") as src:
+                    with open(PROCESSED_LOG_OLD, "a") as dst:
+                        dst.write(src.read())
+                os.remove(PROCESSED_LOG)
+            else:
+                os.replace(PROCESSED_LOG, PROCESSED_LOG_OLD)
+        except OSError as e:
+            logger.warning(f"Processed log rotation failed: {e}")
+
+def _write_processed_messages():
+    """Write all channel filters to files (blocking, runs in executor)"""
+    all_written = True
+    for chat_id, bloom in list(processed_blooms.items()):
+        fichier = get_processed_fichier(chat_id)
+        try:
+            # Write to a temp file and rename so a crash mid-write can
+            # never leave a truncated filter behind
+            with open(fichier + ".tmp", "wb") as f:
+                bloom.tofile(f)
+            # The channel may have been reset on the loop thread while we
+            # were writing; renaming now would resurrect its history
+            if chat_id in processed_blooms:
+                os.replace(fichier + ".tmp", fichier)
+            else:
+                os.remove(fichier + ".tmp")
+        except OSError as e:
+            all_written = False
+            logger.warning(f"Filter write failed for channel {chat_id}: {e}")
+
+    # Deletions are authoritative too: drop any filter file whose channel
+    # is no longer tracked (reset raced an earlier snapshot, or its file
+    # was unreadable at startup)
+    for fichier in os.listdir("."):
+        if fichier.startswith("processed_") and fichier.endswith(".bf"):
+            try:
+                chat_id = int(fichier.replace("processed_", "").replace(".bf", ""))
+            except ValueError:
+                continue
+            if chat_id not in processed_blooms:
+                try:
+                    os.remove(fichier)
+                except OSError as e:
+                    logger.warning(f"Could not remove {fichier}: {e}")
+
+    # The snapshots cover everything logged before the rotation, so the
+    # rotated log can go -- but only if every filter actually made it
+    if all_written and os.path.exists(PROCESSED_LOG_OLD):
+        try:
+            os.remove(PROCESSED_LOG_OLD)
+        except OSError as e:
+            logger.warning(f"Could not remove {PROCESSED_LOG_OLD}: {e}")
 
 def save_processed_messages():
-    """Save processed messages to file"""
+    """Queue processed messages filters for the debounced flusher"""
+    global _processed_dirty
     try:
-        with open("processed_messages.json", "w") as f:
-            json.dump(list(processed_messages), f)
-    except:
-        pass
+        asyncio.get_running_loop()
+    except RuntimeError:
+        _rotate_processed_log()
+        _write_processed_messages()
+    else:
+        _processed_dirty = True
+        _persist_event.set()
+
+async def _persistence_flusher():
+    """Coalesce status/processed-messages writes to one per flush interval"""
+    global _status_dirty, _processed_dirty
+    loop = asyncio.get_running_loop()
+    while True:
+        await _persist_event.wait()
+        # Let a burst of updates accumulate before writing
+        await asyncio.sleep(FLUSH_INTERVAL)
+        _persist_event.clear()
+        if _status_dirty:
+            _status_dirty = False
+            await loop.run_in_executor(None, _write_status, _status_payload)
+        if _processed_dirty:
+            _processed_dirty = False
+            # Rotate on the loop thread, then snapshot in the executor
+            _rotate_processed_log()
+            await loop.run_in_executor(None, _write_processed_messages)
+
+# Reply coalescing: during a burst on one channel, send a single counter
+# summary per window instead of one reply per message
+REPLY_COALESCE_DELAY = 0.5
+_pending_replies = {}  # {chat_id: task}
 
 # Dictionary to track pending edited messages
-pending_edits = {}  # {message_id: {"chat_id": chat_id, "task": task, "text": text}}
+PendingEdit = namedtuple("PendingEdit", "chat_id task text")
+pending_edits = {}  # {message_id: PendingEdit}
+pending_edits_by_chat = {}  # {chat_id: {message_id, ...}} index for per-channel reset
+
+# Strong references to fire-and-forget tasks (the event loop only keeps weak ones)
+background_tasks = set()
+
+def _spawn(coro):
+    """Create a background task and keep a strong reference until it finishes"""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle incoming messages"""
@@ -92,19 +391,22 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Handle edited messages with delay
     if update.edited_channel_post:
-        # Cancel any existing pending task for this message
-        if message_id in pending_edits:
-            pending_edits[message_id]["task"].cancel()
-        
+        entry = pending_edits.get(message_id)
+        if entry is not None:
+            # Telegram can re-deliver an edit with an unchanged body,
+            # keep the already scheduled task in that case
+            if entry.text == text:
+                logger.info(f"Duplicate edit for message #{message_id}, already scheduled")
+                return
+            # Cancel the existing pending task for this message
+            entry.task.cancel()
+
         # Create a new delayed task to process the edited message
-        task = asyncio.create_task(
+        task = _spawn(
             process_message_after_delay(chat_id, message_id, text, context.bot, 3.0)
         )
-        pending_edits[message_id] = {
-            "chat_id": chat_id,
-            "task": task,
-            "text": text
-        }
+        pending_edits[message_id] = PendingEdit(chat_id, task, text)
+        pending_edits_by_chat.setdefault(chat_id, set()).add(message_id)
         logger.info(f"Scheduled delayed processing for edited message #{message_id}")
         return
     
@@ -127,45 +429,51 @@ async def process_message_after_delay(chat_id, message_id, text, bot, delay_seco
         
         mock_msg = MockMessage(chat_id, text)
         await process_message_content(chat_id, text, mock_msg)
-        
-        # Remove from pending edits
-        if message_id in pending_edits:
-            del pending_edits[message_id]
-            
+
         logger.info(f"Processed edited message #{message_id} after delay")
-        
+
     except asyncio.CancelledError:
         logger.info(f"Cancelled processing for message #{message_id}")
+        raise
     except Exception as e:
         logger.error(f"Error processing delayed message #{message_id}: {e}")
+    finally:
+        # Always drop the pending entry, even on error, so dict entries don't leak.
+        # Only remove our own entry: a cancelled task may finish after a newer
+        # edit has already replaced it.
+        entry = pending_edits.get(message_id)
+        if entry is not None and entry.task is asyncio.current_task():
+            del pending_edits[message_id]
+            ids = pending_edits_by_chat.get(chat_id)
+            if ids is not None:
+                ids.discard(message_id)
+                if not ids:
+                    del pending_edits_by_chat[chat_id]
 
 async def process_message_content(chat_id, text, msg):
     """Process the actual message content and count cards"""
     # Check for confirmation symbols - required for ALL messages
-    confirmation_symbols = ['✅', '🔰']
-    has_confirmation = any(symbol in text for symbol in confirmation_symbols)
-    
+    has_confirmation = "✅" in text or "🔰" in text
+
     if not has_confirmation:
         logger.info(f"Message does not contain confirmation symbols (✅ or 🔰), skipping")
         return
     
     # Check for message number to avoid duplicates
-    match_numero = re.search(r"#n(\d+)", text)
+    match_numero = _NUM_RE.search(text)
     if match_numero:
         numero = int(match_numero.group(1))
-        # Create unique key for this channel and message number
-        message_key = f"{chat_id}_{numero}"
-        
+
         # Check if already processed
-        if is_message_processed(message_key):
+        if is_message_processed(chat_id, numero):
             logger.info(f"Message #{numero} already processed for channel {chat_id}")
             return
-        
+
         # Mark as processed
-        mark_message_processed(message_key)
+        mark_message_processed(chat_id, numero)
     
     # Find FIRST parentheses only
-    match = re.search(r'\(([^()]*)\)', text)
+    match = _PAREN_RE.search(text)
     if not match:
         logger.info("No parentheses found")
         return
@@ -173,20 +481,21 @@ async def process_message_content(chat_id, text, msg):
     content = match.group(1)
     logger.info(f"Channel {chat_id} - Content: '{content}'")
     
-    # Count ALL card symbols in the content (including both heart symbols)
+    # Count ALL card symbols in one pass over the content
+    counts = Counter(_ALL_SUITS_RE.findall(content))
     cards_found = {}
     total_cards = 0
-    
-    # Check for hearts (both symbols)
-    heart_count = content.count("❤️") + content.count("♥️")
+
+    # Check for hearts (both symbols count as ❤️)
+    heart_count = counts["❤️"] + counts["♥️"]
     if heart_count > 0:
         update_compteurs(chat_id, "❤️", heart_count)
         cards_found["❤️"] = heart_count
         total_cards += heart_count
-    
+
     # Check other symbols
-    for symbol in ["♦️", "♣️", "♠️"]:
-        count = content.count(symbol)
+    for symbol in _SUITS:
+        count = counts[symbol]
         if count > 0:
             update_compteurs(chat_id, symbol, count)
             cards_found[symbol] = count
@@ -199,15 +508,28 @@ async def process_message_content(chat_id, text, msg):
     logger.info(f"Channel {chat_id} - Cards counted: {cards_found}")
     
     save_bot_status(True, f"Channel {chat_id}: {cards_found}")
-    
+
+    # Schedule one coalesced reply per channel; the counters are already
+    # updated, so the flush reads the final totals for the window
+    if chat_id not in _pending_replies:
+        _pending_replies[chat_id] = _spawn(_flush_reply(chat_id, msg))
+
+async def _flush_reply(chat_id, msg):
+    """Send one counter summary for a channel after the coalescing window"""
     try:
+        await asyncio.sleep(REPLY_COALESCE_DELAY)
+
         # Get updated counters and send response
         compteurs_updated = get_compteurs(chat_id)
         response = afficher_compteurs_canal(compteurs_updated, style_affichage)
         await msg.reply_text(response)
         logger.info(f"Response sent to channel {chat_id}")
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
         logger.error(f"Send error: {e}")
+    finally:
+        _pending_replies.pop(chat_id, None)
 
 async def reset_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Reset command"""
@@ -216,35 +538,38 @@ async def reset_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
     chat_id = update.message.chat_id
     reset_compteurs_canal(chat_id)
-    
+
+    cancelled = []
+
     # Cancel auto report if active
-    if chat_id in auto_report_settings and auto_report_settings[chat_id].get("task"):
-        auto_report_settings[chat_id]["task"].cancel()
+    if chat_id in auto_report_settings:
+        task = auto_report_settings[chat_id].task
+        task.cancel()
+        cancelled.append(task)
         del auto_report_settings[chat_id]
-    
-    # Cancel all pending edited messages for this channel
-    global pending_edits
-    to_cancel = []
-    for message_id, edit_info in pending_edits.items():
-        if edit_info["chat_id"] == chat_id:
-            edit_info["task"].cancel()
-            to_cancel.append(message_id)
-    
-    for message_id in to_cancel:
-        del pending_edits[message_id]
-    
+
+    # Drop any reply still waiting in the coalescing window
+    reply_task = _pending_replies.pop(chat_id, None)
+    if reply_task is not None:
+        reply_task.cancel()
+        cancelled.append(reply_task)
+
+    # Cancel all pending edited messages for this channel (indexed, no full scan)
+    for message_id in pending_edits_by_chat.pop(chat_id, ()):
+        edit_info = pending_edits.pop(message_id, None)
+        if edit_info is not None:
+            edit_info.task.cancel()
+            cancelled.append(edit_info.task)
+
+    # Let the cancellations complete so the tasks are fully torn down
+    if cancelled:
+        await asyncio.gather(*cancelled, return_exceptions=True)
+
     # Clear processed messages for this channel
-    global processed_messages
-    processed_messages = {key for key in processed_messages if not key.startswith(f"{chat_id}_")}
+    clear_processed_messages(chat_id)
     save_processed_messages()
-    
-    await update.message.reply_text(
-        "✅ **Reset effectué pour ce canal**\n\n"
-        "📊 Compteurs remis à zéro\n"
-        "⏰ Bilans automatiques arrêtés\n"
-        "🔄 Historique des messages effacé\n"
-        "⏳ Éditions en attente annulées"
-    )
+
+    await update.message.reply_text(_RESET_MSG)
     save_bot_status(True, f"Reset completed for channel {chat_id}")
 
 async def deposer_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -255,15 +580,20 @@ async def deposer_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         await update.message.reply_text("📦 Création du package de déploiement en cours...")
         
-        # Import and run the deployment package creation
+        # Import and run the deployment package creation in a worker thread
+        # so zipping the repo doesn't stall the event loop
         from create_deploy_package import create_deployment_package
-        zip_filename = create_deployment_package()
-        
+        zip_filename = await asyncio.to_thread(create_deployment_package)
+
         # Check if file exists
         if os.path.exists(zip_filename):
-            # Send the ZIP file
+            def _read_zip():
+                with open(zip_filename, "rb") as f:
+                    return f.read()
+
+            # Send the ZIP file (read off the loop as well)
             await update.message.reply_document(
-                document=open(zip_filename, 'rb'),
+                document=await asyncio.to_thread(_read_zip),
                 filename=zip_filename,
                 caption="✅ Package de déploiement créé avec succès !\n🚀 Prêt pour upload sur render.com"
             )
@@ -284,43 +614,28 @@ async def time_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     chat_id = update.message.chat_id
     
-    if not context.args or not context.args[0].isdigit():
-        await update.message.reply_text(
-            "⏰ **Commande /time**\n\n"
-            "Définit l'intervalle pour les bilans automatiques.\n\n"
-            "📝 **Usage :** /time [minutes]\n"
-            "📊 **Exemple :** /time 15\n\n"
-            "⏱️ **Intervalle autorisé :** 5 à 32 minutes\n\n"
-            "💡 **Note :** Le bilan sera envoyé automatiquement "
-            "et les compteurs seront remis à zéro après chaque bilan."
-        )
+    # Single parse handles missing, non-numeric, negative and decimal input
+    try:
+        interval = int(context.args[0])
+    except (IndexError, TypeError, ValueError):
+        await update.message.reply_text(_TIME_USAGE_MSG)
         return
-    
-    interval = int(context.args[0])
-    
+
     if interval < 5 or interval > 32:
-        await update.message.reply_text(
-            "❌ **Erreur d'intervalle**\n\n"
-            "L'intervalle doit être entre 5 et 32 minutes.\n"
-            f"Vous avez saisi : {interval} minutes"
-        )
+        await update.message.reply_text(_INTERVAL_ERR_TMPL.format(interval=interval))
         return
     
-    # Cancel existing auto report task if any
-    if chat_id in auto_report_settings and auto_report_settings[chat_id].get("task"):
-        auto_report_settings[chat_id]["task"].cancel()
-    
+    # Cancel existing auto report task if any and wait for it to finish
+    if chat_id in auto_report_settings:
+        old_task = auto_report_settings[chat_id].task
+        old_task.cancel()
+        await asyncio.gather(old_task, return_exceptions=True)
+
     # Create new auto report task
-    task = asyncio.create_task(auto_report_cycle(chat_id, interval, context.bot))
-    auto_report_settings[chat_id] = {"interval": interval, "task": task}
+    task = _spawn(auto_report_cycle(chat_id, interval, context.bot))
+    auto_report_settings[chat_id] = AutoReport(interval, task)
     
-    await update.message.reply_text(
-        f"✅ **Bilan automatique configuré**\n\n"
-        f"⏰ **Intervalle :** {interval} minutes\n"
-        f"🕐 **Prochaine execution :** dans {interval} minutes\n\n"
-        "📊 Le bilan sera envoyé automatiquement avec l'heure du Bénin,\n"
-        "puis les compteurs seront remis à zéro."
-    )
+    await update.message.reply_text(_TIME_SET_TMPL.format(interval=interval))
     
     save_bot_status(True, f"Auto report set to {interval}min for channel {chat_id}")
 
@@ -336,14 +651,12 @@ async def auto_report_cycle(chat_id, interval_minutes, bot):
             benin_time = get_benin_time()
             
             # Format the automatic report
-            report_msg = (
-                "📊 **Bilan automatique du compteur**\n\n"
-                f"🕐 **Heure :** {benin_time.strftime('%H:%M:%S')} (heure du Bénin)\n\n"
-                f"♣️ **Trèfle :** {compteurs['♣️']} ✅\n"
-                f"♦️ **Carreau :** {compteurs['♦️']} ✅\n"
-                f"♠️ **Pique :** {compteurs['♠️']} ✅\n"
-                f"❤️ **Coeur :** {compteurs['❤️']} ✅\n\n"
-                "🔄 **Compteurs remis à zéro pour le prochain cycle**"
+            report_msg = _AUTO_REPORT_TMPL.format(
+                heure=benin_time.strftime('%H:%M:%S'),
+                trefle=compteurs['♣️'],
+                carreau=compteurs['♦️'],
+                pique=compteurs['♠️'],
+                coeur=compteurs['❤️']
             )
             
             # Send the report
@@ -353,8 +666,7 @@ async def auto_report_cycle(chat_id, interval_minutes, bot):
             reset_compteurs_canal(chat_id)
             
             # Clear processed messages for this channel
-            global processed_messages
-            processed_messages = {key for key in processed_messages if not key.startswith(f"{chat_id}_")}
+            clear_processed_messages(chat_id)
             save_processed_messages()
             
             logger.info(f"Auto report sent and counters reset for channel {chat_id}")
@@ -366,22 +678,7 @@ async def auto_report_cycle(chat_id, interval_minutes, bot):
 
 async def start_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start command"""
-    welcome_msg = (
-        "🤖 **Bot de Comptage de Cartes** 🃏\n\n"
-        "Bonjour ! Je compte les cartes séparément pour chaque canal.\n\n"
-        "📝 **Comment ça marche :**\n"
-        "• Envoyez un message avec des cartes entre parenthèses\n"
-        "• Exemple : Résultat du tirage (❤️♦️♣️♠️)\n"
-        "• Je compterai automatiquement chaque symbole\n\n"
-        "🎯 **Symboles reconnus :**\n"
-        "❤️ Cœurs • ♦️ Carreaux • ♣️ Trèfles • ♠️ Piques\n\n"
-        "💡 **Commandes disponibles :**\n"
-        "• /reset - Réinitialiser les compteurs\n"
-        "• /time [minutes] - Configurer bilans automatiques (5-32min)\n"
-        "• /deposer - Créer package de déploiement\n\n"
-        "⚡ Je suis maintenant actif et prêt à compter !"
-    )
-    await update.message.reply_text(welcome_msg)
+    await update.message.reply_text(_WELCOME_MSG)
     chat_id = update.message.chat_id
     save_bot_status(True, f"Bot started in channel {chat_id}")
 
@@ -390,34 +687,36 @@ async def new_chat_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Check if the bot itself was added
     for member in update.message.new_chat_members:
         if member.id == context.bot.id:
-            welcome_msg = (
-                "👋 **Salut tout le monde !** 🃏\n\n"
-                "Je suis le **Bot de Comptage de Cartes** !\n\n"
-                "🎯 **Ma mission :**\n"
-                "Je vais compter automatiquement tous les symboles de cartes "
-                "que vous mettez entre parenthèses dans vos messages.\n\n"
-                "📋 **Les compteurs sont séparés par canal !**\n"
-                "Chaque canal aura ses propres totaux.\n\n"
-                "🃏 **Cartes reconnues :**\n"
-                "❤️ Cœurs • ♦️ Carreaux • ♣️ Trèfles • ♠️ Piques\n\n"
-                "⚡ **Je suis maintenant actif !**\n\n"
-                "💡 **Commandes utiles :**\n"
-                "• /reset - Réinitialiser les compteurs de ce canal\n"
-                "• /time [minutes] - Bilans automatiques (5-32min)\n"
-                "• /start - Revoir ce message d'aide"
-            )
-            
             await context.bot.send_message(
                 chat_id=update.message.chat_id,
-                text=welcome_msg
+                text=_GROUP_WELCOME_MSG
             )
             chat_id = update.message.chat_id
             save_bot_status(True, f"Bot added to channel {chat_id}")
             logger.info(f"Bot added to chat: {chat_id}")
             break
 
+async def _post_init(app):
+    """Start background persistence once the event loop is running"""
+    _spawn(_persistence_flusher())
+
+async def _post_shutdown(app):
+    """Flush any pending state before the loop stops"""
+    _write_status(_status_payload)
+    _rotate_processed_log()
+    _write_processed_messages()
+
 def main():
     """Main function"""
+    # Use uvloop when available (I/O-bound workload, no other changes needed)
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            uvloop.install()
+            logger.info("uvloop installed as event loop policy")
+        except ImportError:
+            pass
+
     # Get token
     token = os.getenv("TELEGRAM_BOT_TOKEN")
     if not token:
@@ -431,7 +730,20 @@ def main():
     save_bot_status(True, "Starting...")
     
     # Create app
-    app = Application.builder().token(token).build()
+    # Explicit pool sizing: concurrent sends across many channels saturate
+    # the small default HTTPX connection pool
+    app = (
+        Application.builder()
+        .token(token)
+        .connection_pool_size(256)
+        .pool_timeout(20)
+        .connect_timeout(5)
+        .read_timeout(20)
+        .get_updates_connection_pool_size(32)
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
     
     # Add handlers
     app.add_handler(CommandHandler("start", start_cmd))
@@ -453,23 +765,21 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         # Cancel all auto report tasks
         for chat_id, settings in auto_report_settings.items():
-            if settings.get("task"):
-                settings["task"].cancel()
-        
+            settings.task.cancel()
+
         # Cancel all pending edit tasks
         for message_id, edit_info in pending_edits.items():
-            edit_info["task"].cancel()
-        
+            edit_info.task.cancel()
+
         save_bot_status(False, "Stopped")
     except Exception as e:
         # Cancel all auto report tasks
         for chat_id, settings in auto_report_settings.items():
-            if settings.get("task"):
-                settings["task"].cancel()
-        
+            settings.task.cancel()
+
         # Cancel all pending edit tasks
         for message_id, edit_info in pending_edits.items():
-            edit_info["task"].cancel()
-        
+            edit_info.task.cancel()
+
         save_bot_status(False, error=str(e))
         logger.error(f"Error: {e}")